@@ -4,11 +4,170 @@ import subprocess
 import shutil
 import os
 import json
-import tempfile
 import gettext
+import hashlib
+import functools
+import re
+import wave
+import threading
+import time
+import atexit
+import queue
+from concurrent.futures import ThreadPoolExecutor
 
 TEXTDOMAIN = 'tts-tester'
-_ = gettext.gettext
+_ = gettext.translation(
+    TEXTDOMAIN, '/usr/share/locale', fallback=True
+).gettext
+
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "tts-tester",
+)
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Partial files older than this were left behind by an interrupted synthesis
+CACHE_STALE_TMP_SECONDS = 3600
+
+@functools.lru_cache(maxsize=None)
+def _which_cached(name, path):
+    return shutil.which(name, path=path)
+
+
+def _which(name):
+    """Like shutil.which(), but only searches PATH again when it changes."""
+    return _which_cached(name, os.environ.get("PATH", os.defpath))
+
+
+_SENTENCE_END = re.compile(r'(?<=[.!?…])\s+')
+
+_SSML_SILENCE = re.compile(
+    r'\s*(?:<speak>)?\s*(?:<break\s+time="\d+m?s"\s*/>\s*)+(?:</speak>)?\s*'
+)
+_BREAK_TIME = re.compile(r'time="(\d+)(ms|s)"')
+
+
+def _silence_ms(text):
+    """Return the length of SSML made only of <break> tags, else None."""
+    if not _SSML_SILENCE.fullmatch(text):
+        return None
+    return sum(int(value) * (1 if unit == "ms" else 1000)
+               for value, unit in _BREAK_TIME.findall(text))
+
+
+def _write_silence(path, ms, sample_rate):
+    """Write a mono 16-bit WAV of ms milliseconds of silence."""
+    with wave.open(path, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+        out.writeframes(b"\0\0" * (sample_rate * ms // 1000))
+
+
+def _segment(text):
+    """Split plain text into sentences."""
+    return [seg for seg in _SENTENCE_END.split(text.strip()) if seg]
+
+
+def _scheme_escape(s):
+    """Escape s for use inside a double-quoted Scheme string."""
+    return s.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _concat_wavs(paths, output_file):
+    """Concatenate WAV files with identical formats into output_file."""
+    with wave.open(output_file, "wb") as out:
+        for i, path in enumerate(paths):
+            with wave.open(path, "rb") as seg:
+                if i == 0:
+                    out.setparams(seg.getparams())
+                out.writeframes(seg.readframes(seg.getnframes()))
+
+
+# Running size of the cached WAVs, so writes don't have to walk the cache.
+# None until the first scan in this process.
+_cache_bytes = None
+_cache_lock = threading.Lock()
+
+
+def _scan_cache():
+    """Walk the cache, dropping stale partial files.
+
+    Returns (entries, total) where entries are (mtime, size, path) tuples
+    for the cached WAVs and total is their combined size.
+    """
+    entries = []
+    total = 0
+    stale = time.time() - CACHE_STALE_TMP_SECONDS
+    for root, _dirs, files in os.walk(CACHE_DIR):
+        for f in files:
+            path = os.path.join(root, f)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if f.endswith(".tmp"):
+                if st.st_mtime < stale:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                continue
+            if not f.endswith(".wav"):
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+    return entries, total
+
+
+def _evict_cache(*added):
+    """Count newly cached files and, past CACHE_MAX_BYTES, delete LRU WAVs.
+
+    The cache is only walked on the first call in a process and when the
+    running total goes over the limit.
+    """
+    global _cache_bytes
+    with _cache_lock:
+        if _cache_bytes is not None:
+            for path in added:
+                try:
+                    _cache_bytes += os.path.getsize(path)
+                except OSError:
+                    pass
+            if _cache_bytes <= CACHE_MAX_BYTES:
+                return
+        entries, total = _scan_cache()
+        if total > CACHE_MAX_BYTES:
+            entries.sort()
+            for _mtime, size, path in entries:
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                if total <= CACHE_MAX_BYTES:
+                    break
+        _cache_bytes = total
+
+
+def _fill_cache(path, write, tmp=None):
+    """Return the cached file at path, creating it on a miss.
+
+    A hit refreshes the file's mtime for the LRU eviction. On a miss
+    write(tmp) must create tmp and return True; tmp is then moved into
+    place. Returns None if writing fails.
+    """
+    if os.path.exists(path):
+        os.utime(path)
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = tmp or path + ".tmp"
+    if not write(tmp) or not os.path.exists(tmp):
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return None
+    os.replace(tmp, path)
+    _evict_cache(path)
+    return path
 
 
 class TTSEngine:
@@ -17,21 +176,34 @@ class TTSEngine:
     name = "base"
     display_name = "Base"
 
+    # Sample rate of the engine's WAV output
+    SAMPLE_RATE = 22050
+
+    # Voice list shared by all instances, filled by get_voices()
+    _voices_cache = None
+
     def __init__(self):
         self.speed = 1.0
         self.pitch = 1.0
         self.volume = 1.0
         self.voice = None
+        self._player = None
+        self._stop_event = threading.Event()
 
     @classmethod
     def is_available(cls):
         """Check if this engine is installed."""
         return False
 
-    def get_voices(self):
+    def get_voices(self, force_refresh=False):
         """Return list of (voice_id, display_name) tuples."""
         return []
 
+    @classmethod
+    def invalidate_voices(cls):
+        """Forget the cached voice list so the next lookup rescans."""
+        cls._voices_cache = None
+
     def speak(self, text, output_file=None, ssml=False):
         """Speak text or save to file. Returns output file path or None."""
         raise NotImplementedError
@@ -40,6 +212,128 @@ class TTSEngine:
         """Stop current playback."""
         pass
 
+    def _write_wav(self, text, path, ssml=False):
+        """Synthesize text into a WAV file at path. Returns True on success."""
+        raise NotImplementedError
+
+    def _sample_rate(self):
+        return self.SAMPLE_RATE
+
+    def _speak_silence(self, ms, output_file=None):
+        """Save or wait out ms of silence without running the engine."""
+        if output_file:
+            _write_silence(output_file, ms, self._sample_rate())
+            return output_file
+        self._stop_event.clear()
+        self._stop_event.wait(ms / 1000)
+        return None
+
+    def _cache_path(self, text, ssml):
+        """Return the cache file path for text with the current settings."""
+        key = "\0".join(str(v) for v in (
+            self.name, self.voice, self.speed, self.pitch, self.volume,
+            ssml, text,
+        ))
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(CACHE_DIR, self.name, digest + ".wav")
+
+    def _synthesize_cached(self, text, ssml=False):
+        """Return a cached WAV for text, synthesizing it on a cache miss."""
+        return _fill_cache(
+            self._cache_path(text, ssml),
+            lambda tmp: self._write_wav(text, tmp, ssml),
+        )
+
+    def _synthesize_segments(self, text, ssml=False):
+        """Return a cached WAV for text, synthesizing it sentence by sentence.
+
+        Each sentence is cached on its own, so editing one sentence only
+        re-synthesizes that sentence. SSML is synthesized as a whole since
+        splitting it could break its markup.
+        """
+        segments = [text] if ssml else _segment(text)
+        if len(segments) <= 1:
+            return self._synthesize_cached(text, ssml)
+
+        path = self._cache_path(text, ssml)
+        if os.path.exists(path):
+            os.utime(path)
+            return path
+
+        seg_paths = []
+        for seg in segments:
+            seg_path = self._synthesize_cached(seg, ssml)
+            if not seg_path:
+                return None
+            seg_paths.append(seg_path)
+
+        tmp = path + ".tmp"
+        try:
+            _concat_wavs(seg_paths, tmp)
+        except (wave.Error, EOFError):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return self._synthesize_cached(text, ssml)
+        os.replace(tmp, path)
+        _evict_cache(path)
+        return path
+
+    def _play_pipelined(self, segments, ssml=False):
+        """Play segments in order, synthesizing ahead of playback.
+
+        A worker thread fills the cache with the next segments while the
+        calling thread plays the ones that are ready with aplay.
+        """
+        ready = queue.Queue()
+        errors = []
+        self._stop_event.clear()
+
+        def produce():
+            try:
+                for seg in segments:
+                    if self._stop_event.is_set():
+                        break
+                    path = self._synthesize_cached(seg, ssml)
+                    if not path:
+                        break
+                    ready.put(path)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                ready.put(None)
+
+        threading.Thread(target=produce, daemon=True).start()
+        try:
+            # Poll so stop() is noticed even while synthesis is still running
+            while not self._stop_event.is_set():
+                try:
+                    path = ready.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if path is None or self._stop_event.is_set():
+                    break
+                self._player = subprocess.Popen(["aplay", "-q", path])
+                self._player.wait()
+        finally:
+            self._player = None
+        if errors:
+            raise errors[0]
+
+    def _stop_pipeline(self):
+        """Stop playback started by _play_pipelined()."""
+        self._stop_event.set()
+        player = self._player
+        if player and player.poll() is None:
+            player.terminate()
+
+    def _speak_to_file(self, text, output_file, ssml=False):
+        """Write text to output_file, going through the audio cache."""
+        cached = self._synthesize_segments(text, ssml)
+        if not cached:
+            return None
+        shutil.copyfile(cached, output_file)
+        return output_file
+
     def get_settings(self):
         """Return current settings as dict."""
         return {
@@ -66,29 +360,47 @@ class EspeakEngine(TTSEngine):
     def __init__(self):
         super().__init__()
         self._process = None
+        # Settings the cached command line was built for
+        self._argv_settings = None
 
     @classmethod
     def is_available(cls):
-        return shutil.which("espeak-ng") is not None
+        return _which("espeak-ng") is not None
 
-    def get_voices(self):
+    def get_voices(self, force_refresh=False):
+        cls = type(self)
+        if cls._voices_cache is not None and not force_refresh:
+            return cls._voices_cache
         voices = []
         try:
             result = subprocess.run(
                 ["espeak-ng", "--voices"],
-                capture_output=True, text=True, timeout=10
+                capture_output=True, timeout=10
             )
-            for line in result.stdout.strip().split("\n")[1:]:
-                parts = line.split()
+            output = result.stdout.decode("utf-8", "replace")
+            for line in output.splitlines()[1:]:
+                # Pty Language Age/Gender VoiceName File Other Languages
+                parts = line.split(None, 4)
                 if len(parts) >= 4:
                     lang = parts[1]
                     name = parts[3]
                     voices.append((name, f"{name} ({lang})"))
+            cls._voices_cache = voices
         except (subprocess.SubprocessError, OSError):
             pass
         return voices
 
-    def speak(self, text, output_file=None, ssml=False):
+    def _build_cmd(self, ssml=False):
+        settings = (self.voice, self.speed, self.pitch, self.volume)
+        if settings != self._argv_settings:
+            self._base_argv = self._settings_argv()
+            self._argv_settings = settings
+        cmd = list(self._base_argv)
+        if ssml:
+            cmd.append("-m")
+        return cmd
+
+    def _settings_argv(self):
         cmd = ["espeak-ng"]
 
         if self.voice:
@@ -107,22 +419,67 @@ class EspeakEngine(TTSEngine):
         vol = int(100 * self.volume)
         vol = max(0, min(200, vol))
         cmd += ["-a", str(vol)]
+        return cmd
 
-        if ssml:
-            cmd += ["-m"]
+    def _write_wav(self, text, path, ssml=False):
+        cmd = self._build_cmd(ssml) + ["-w", path, text]
+        self._process = subprocess.Popen(
+            cmd, stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        return self._process.wait() == 0
+
+    def speak_batch(self, texts, output_dir, ssml=False, concurrency=None):
+        """Save each text as a numbered WAV in output_dir.
+
+        Uncached texts are synthesized by several espeak-ng processes at
+        once. Returns the output paths in the order of texts, with None for
+        texts that failed.
+        """
+        base_cmd = self._build_cmd(ssml)
+
+        def synthesize(item):
+            i, text = item
+
+            # Unlike _write_wav() this doesn't go through self._process,
+            # which only has room for one process
+            def write(tmp):
+                result = subprocess.run(
+                    base_cmd + ["-w", tmp, text], stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+                return result.returncode == 0
+
+            path = self._cache_path(text, ssml)
+            # Equal texts in one batch must not share a partial file
+            cached = _fill_cache(path, write, tmp=f"{path}.{i}.tmp")
+            if not cached:
+                return None
+            output_file = os.path.join(output_dir, f"{i + 1:03d}.wav")
+            shutil.copyfile(cached, output_file)
+            return output_file
+
+        workers = concurrency or os.cpu_count() or 1
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            paths = list(ex.map(synthesize, enumerate(texts)))
+        return paths
 
+    def speak(self, text, output_file=None, ssml=False):
+        silence = _silence_ms(text) if ssml else None
+        if silence is not None:
+            return self._speak_silence(silence, output_file)
         if output_file:
-            cmd += ["-w", output_file]
-            cmd.append(text)
-            self._process = subprocess.Popen(cmd)
-            self._process.wait()
-            return output_file
+            return self._speak_to_file(text, output_file, ssml)
         else:
+            cmd = self._build_cmd(ssml)
             cmd.append(text)
-            self._process = subprocess.Popen(cmd)
+            # Block until playback ends; stop() terminates the process
+            process = self._process = subprocess.Popen(cmd)
+            process.wait()
             return None
 
     def stop(self):
+        self._stop_pipeline()
         if self._process and self._process.poll() is None:
             self._process.terminate()
             self._process = None
@@ -134,61 +491,237 @@ class PiperEngine(TTSEngine):
     name = "piper"
     display_name = "Piper"
 
+    # Piper models are in ~/.local/share/piper-voices/ or similar
+    model_dirs = [
+        os.path.expanduser("~/.local/share/piper-voices"),
+        "/usr/share/piper-voices",
+        os.path.expanduser("~/.local/share/piper/voices"),
+    ]
+    _voices_signature = None
+
+    # One long-running piper process keeps the voice model loaded between
+    # calls; it is restarted when the voice or speed changes.
+    _daemon_lock = threading.Lock()
+    _daemon_process = None
+    _daemon_cmd = None
+
     def __init__(self):
         super().__init__()
         self._process = None
+        # Settings the cached command line was built for
+        self._argv_settings = None
 
     @classmethod
     def is_available(cls):
-        return shutil.which("piper") is not None
+        return _which("piper") is not None
 
-    def get_voices(self):
+    @classmethod
+    def _model_dirs_signature(cls):
+        """Return (dir, mtime) pairs so newly installed voices are noticed."""
+        signature = []
+        for model_dir in cls.model_dirs:
+            try:
+                signature.append((model_dir, os.stat(model_dir).st_mtime_ns))
+            except OSError:
+                pass
+        return tuple(signature)
+
+    def get_voices(self, force_refresh=False):
+        cls = type(self)
+        signature = cls._model_dirs_signature()
+        if (cls._voices_cache is not None and not force_refresh
+                and signature == cls._voices_signature):
+            return cls._voices_cache
         voices = []
-        # Piper models are in ~/.local/share/piper-voices/ or similar
-        model_dirs = [
-            os.path.expanduser("~/.local/share/piper-voices"),
-            "/usr/share/piper-voices",
-            os.path.expanduser("~/.local/share/piper/voices"),
-        ]
-        for model_dir in model_dirs:
-            if os.path.isdir(model_dir):
-                for f in sorted(os.listdir(model_dir)):
-                    if f.endswith(".onnx"):
-                        name = f.replace(".onnx", "")
-                        voices.append((os.path.join(model_dir, f), name))
+        for model_dir in cls.model_dirs:
+            try:
+                with os.scandir(model_dir) as it:
+                    entries = sorted(
+                        (e for e in it
+                         if e.name.endswith(".onnx") and e.is_file()),
+                        key=lambda e: e.name
+                    )
+            except OSError:
+                continue
+            for entry in entries:
+                voices.append((entry.path, entry.name[:-len(".onnx")]))
         if not voices:
             voices.append(("", _("(default)")))
+        cls._voices_cache = voices
+        cls._voices_signature = signature
         return voices
 
-    def speak(self, text, output_file=None, ssml=False):
-        if not output_file:
-            output_file = tempfile.mktemp(suffix=".wav")
+    def _build_cmd(self):
+        # --model is only passed for an existing file, so that is keyed too
+        settings = (
+            self.voice, self.speed,
+            bool(self.voice) and os.path.isfile(self.voice),
+        )
+        if settings != self._argv_settings:
+            self._base_argv = self._settings_argv()
+            self._argv_settings = settings
+        return list(self._base_argv)
 
-        cmd = ["piper", "--output_file", output_file]
+    def _settings_argv(self):
+        cmd = ["piper"]
 
-        if self.voice and self.voice != "":
+        # piper waits on stdin for a while before failing on a missing model
+        if self.voice and os.path.isfile(self.voice):
             cmd += ["--model", self.voice]
 
         # Piper supports --length_scale for speed (inverse: higher = slower)
         if self.speed != 1.0:
             length_scale = 1.0 / max(0.1, self.speed)
             cmd += ["--length_scale", str(length_scale)]
+        return cmd
 
-        self._process = subprocess.Popen(
-            cmd, stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    def _sample_rate(self):
+        """Return the voice's sample rate from its .onnx.json config."""
+        if self.voice:
+            try:
+                with open(self.voice + ".json", "r") as f:
+                    return int(json.load(f)["audio"]["sample_rate"])
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+        return self.SAMPLE_RATE
+
+    def _daemon(self):
+        """Return the shared piper process for the current settings.
+
+        The caller must hold _daemon_lock.
+        """
+        cls = PiperEngine
+        cmd = self._build_cmd()
+        process = cls._daemon_process
+        if process is None or process.poll() is not None or cmd != cls._daemon_cmd:
+            cls._terminate_daemon()
+            output_dir = os.path.join(CACHE_DIR, self.name)
+            os.makedirs(output_dir, exist_ok=True)
+            process = subprocess.Popen(
+                cmd + ["--json-input", "--output_dir", output_dir],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL, text=True, bufsize=1
+            )
+            cls._daemon_process = process
+            cls._daemon_cmd = cmd
+        return process
+
+    @classmethod
+    def _terminate_daemon(cls):
+        process = cls._daemon_process
+        if process and process.poll() is None:
+            process.terminate()
+        cls._daemon_process = None
+        cls._daemon_cmd = None
+
+    @classmethod
+    def shutdown_daemon(cls):
+        """Stop the shared piper process."""
+        with cls._daemon_lock:
+            cls._terminate_daemon()
+
+    def _write_wav(self, text, path, ssml=False):
+        with PiperEngine._daemon_lock:
+            process = self._daemon()
+            request = json.dumps({"text": text, "output_file": path})
+            try:
+                process.stdin.write(request + "\n")
+                process.stdin.flush()
+                # piper prints the path of each file once it is written
+                done = process.stdout.readline()
+            except OSError:
+                return False
+        return bool(done) and os.path.exists(path)
+
+    def _stream(self, text, path):
+        """Play raw PCM from piper while it is generated, caching it as WAV."""
+        rate = self._sample_rate()
+        piper = subprocess.Popen(
+            self._build_cmd() + ["--output_raw"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        player = subprocess.Popen(
+            ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-c", "1",
+             "-r", str(rate)],
+            stdin=subprocess.PIPE
         )
-        self._process.communicate(input=text.encode())
+        self._process = (piper, player)
+
+        def feed():
+            try:
+                piper.stdin.write(text.encode())
+                piper.stdin.close()
+            except OSError:
+                pass
+
+        threading.Thread(target=feed, daemon=True).start()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        complete = True
+        with wave.open(tmp, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(rate)
+            for chunk in iter(lambda: piper.stdout.read(4096), b""):
+                wav.writeframes(chunk)
+                try:
+                    player.stdin.write(chunk)
+                except OSError:
+                    complete = False
+                    break
+        if not complete:
+            # The player is gone; stop piper and drain its pipe so it can't
+            # block on a full stdout and hang piper.wait() below
+            piper.terminate()
+            piper.stdout.read()
+        try:
+            player.stdin.close()
+        except OSError:
+            pass
 
-        # Play the output file
-        if os.path.exists(output_file):
-            return output_file
+        if piper.wait() == 0 and player.wait() == 0 and complete:
+            os.replace(tmp, path)
+            _evict_cache(path)
+            return path
+        os.remove(tmp)
         return None
 
+    def speak(self, text, output_file=None, ssml=False):
+        silence = _silence_ms(text) if ssml else None
+        if silence is not None:
+            return self._speak_silence(silence, output_file)
+        if output_file:
+            return self._speak_to_file(text, output_file, ssml)
+        if not _which("aplay"):
+            return self._synthesize_segments(text, ssml)
+
+        path = self._cache_path(text, ssml)
+        if os.path.exists(path):
+            os.utime(path)
+            self._process = subprocess.Popen(["aplay", "-q", path])
+            self._process.wait()
+            return path
+        segments = [text] if ssml else _segment(text)
+        if len(segments) > 1:
+            self._play_pipelined(segments, ssml)
+            return None
+        return self._stream(text, path)
+
     def stop(self):
-        if self._process and self._process.poll() is None:
-            self._process.terminate()
-            self._process = None
+        self._stop_pipeline()
+        processes = self._process
+        if not isinstance(processes, tuple):
+            processes = (processes,)
+        for process in processes:
+            if process and process.poll() is None:
+                process.terminate()
+        self._process = None
+        # Interrupt a synthesis in progress; the next call respawns piper
+        daemon = PiperEngine._daemon_process
+        if PiperEngine._daemon_lock.locked() and daemon and daemon.poll() is None:
+            daemon.terminate()
 
 
 class FestivalEngine(TTSEngine):
@@ -197,83 +730,147 @@ class FestivalEngine(TTSEngine):
     name = "festival"
     display_name = "Festival"
 
+    # Rate of the default kal_diphone voice
+    SAMPLE_RATE = 16000
+
     def __init__(self):
         super().__init__()
         self._process = None
+        # Settings the cached command line was built for
+        self._argv_settings = None
 
     @classmethod
     def is_available(cls):
-        return shutil.which("festival") is not None
+        return _which("festival") is not None
 
-    def get_voices(self):
+    def get_voices(self, force_refresh=False):
+        cls = type(self)
+        if cls._voices_cache is not None and not force_refresh:
+            return cls._voices_cache
         voices = []
         try:
             result = subprocess.run(
                 ["festival", "-b", "(voice.list)"],
-                capture_output=True, text=True, timeout=10
+                capture_output=True, timeout=10
             )
             # Parse Scheme output like (kal_diphone cmu_us_slt_arctic_hts ...)
-            output = result.stdout.strip()
+            output = result.stdout.decode("utf-8", "replace").strip()
             if output.startswith("(") and output.endswith(")"):
                 names = output[1:-1].split()
                 for name in names:
                     voices.append((name, name))
+            cls._voices_cache = voices
         except (subprocess.SubprocessError, OSError):
             pass
         return voices
 
+    def _scheme_prelude(self):
+        # The voice list decides whether the voice is used, so it is part of
+        # the key; a list rescanned after invalidate_voices() rebuilds it
+        settings = (self.voice, self.speed, self.get_voices())
+        if settings != self._argv_settings:
+            self._prelude = self._settings_prelude()
+            self._argv_settings = settings
+        return self._prelude
+
+    def _settings_prelude(self):
+        scheme_cmd = ""
+        # The voice is evaluated as a Scheme call, so only use known voices
+        if self.voice and self.voice in {v[0] for v in self.get_voices()}:
+            scheme_cmd += f'({self.voice})\n'
+        if self.speed != 1.0:
+            rate = self.speed
+            scheme_cmd += f'(Parameter.set \'Duration_Stretch {1.0/rate})\n'
+        return scheme_cmd
+
+    def _write_wav(self, text, path, ssml=False):
+        scheme_cmd = self._scheme_prelude()
+        scheme_cmd += f'(set! utt1 (SynthText "{_scheme_escape(text)}"))\n'
+        scheme_cmd += f'(utt.save.wave utt1 "{_scheme_escape(path)}")\n'
+
+        self._process = subprocess.Popen(
+            ["festival"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        self._process.communicate(input=scheme_cmd.encode())
+        return self._process.returncode == 0
+
     def speak(self, text, output_file=None, ssml=False):
+        silence = _silence_ms(text) if ssml else None
+        if silence is not None:
+            return self._speak_silence(silence, output_file)
         if output_file:
-            # Generate WAV file
-            scheme_cmd = ""
-            if self.voice:
-                scheme_cmd += f'({self.voice})\n'
-            if self.speed != 1.0:
-                rate = self.speed
-                scheme_cmd += f'(Parameter.set \'Duration_Stretch {1.0/rate})\n'
-            scheme_cmd += f'(set! utt1 (SynthText "{text}"))\n'
-            scheme_cmd += f'(utt.save.wave utt1 "{output_file}")\n'
-
-            self._process = subprocess.Popen(
-                ["festival"],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            self._process.communicate(input=scheme_cmd.encode())
-            return output_file
+            return self._speak_to_file(text, output_file, ssml)
+        segments = [text] if ssml else _segment(text)
+        if len(segments) > 1 and _which("aplay"):
+            self._play_pipelined(segments, ssml)
+            return None
         else:
             # Direct playback
-            scheme_cmd = ""
-            if self.voice:
-                scheme_cmd += f'({self.voice})\n'
-            if self.speed != 1.0:
-                rate = self.speed
-                scheme_cmd += f'(Parameter.set \'Duration_Stretch {1.0/rate})\n'
-            scheme_cmd += f'(SayText "{text}")\n'
+            scheme_cmd = self._scheme_prelude()
+            scheme_cmd += f'(SayText "{_scheme_escape(text)}")\n'
 
             self._process = subprocess.Popen(
                 ["festival"],
                 stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
             )
             self._process.communicate(input=scheme_cmd.encode())
             return None
 
     def stop(self):
+        self._stop_pipeline()
         if self._process and self._process.poll() is None:
             self._process.terminate()
             self._process = None
 
 
+atexit.register(PiperEngine.shutdown_daemon)
+
+
 # Registry of all engine classes
 ENGINE_CLASSES = [EspeakEngine, PiperEngine, FestivalEngine]
 
 
-def detect_engines():
-    """Return list of available engine classes."""
-    return [cls for cls in ENGINE_CLASSES if cls.is_available()]
+# Engine class -> is_available() result, filled by detect_engines()
+_availability = {}
+
+
+def detect_engines(refresh=False):
+    """Return list of available engine classes.
+
+    Engines are probed in parallel once per process; pass refresh=True to
+    probe again, e.g. after installing an engine.
+    """
+    if refresh:
+        _which_cached.cache_clear()
+    if refresh or len(_availability) != len(ENGINE_CLASSES):
+        with ThreadPoolExecutor(max_workers=len(ENGINE_CLASSES)) as ex:
+            results = ex.map(lambda cls: cls.is_available(), ENGINE_CLASSES)
+            _availability.clear()
+            _availability.update(zip(ENGINE_CLASSES, results))
+    return [cls for cls in ENGINE_CLASSES if _availability[cls]]
+
+
+def engines_signature():
+    """Return a value that changes when engine executables change.
+
+    It covers PATH and the resolved path and mtime of each engine's
+    executable (named after the engine), so a caller can skip
+    detect_engines(refresh=True) while it compares equal.
+    """
+    path = os.environ.get("PATH", os.defpath)
+    signature = [path]
+    for cls in ENGINE_CLASSES:
+        exe = shutil.which(cls.name, path=path)
+        try:
+            signature.append((exe, os.stat(exe).st_mtime_ns if exe else None))
+        except OSError:
+            signature.append((exe, None))
+    return tuple(signature)
 
 
 def get_engine(name):
@@ -1,23 +1,112 @@
 """Settings and favorites management for tts-tester."""
 
+import hashlib
 import json
+import mmap
 import os
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-CONFIG_DIR = os.path.expanduser("~/.config/tts-tester")
+
+CONFIG_DIR = os.path.join(
+    os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config"),
+    "tts-tester",
+)
 SETTINGS_FILE = os.path.join(CONFIG_DIR, "settings.json")
 FAVORITES_FILE = os.path.join(CONFIG_DIR, "favorites.json")
 
 
+if orjson is not None:
+    def dumps(obj):
+        """Serialize obj to indented JSON bytes."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    loads = orjson.loads
+else:
+    def dumps(obj):
+        """Serialize obj to indented JSON bytes."""
+        return json.dumps(obj, indent=2).encode("utf-8")
+
+    loads = json.loads
+
+
+_config_dir_ready = False
+
+
 def _ensure_config_dir():
+    global _config_dir_ready
+    if _config_dir_ready:
+        return
     os.makedirs(CONFIG_DIR, exist_ok=True)
+    _config_dir_ready = True
+
+
+# Files at least this big are parsed straight from a memory map when
+# orjson is available; the stdlib parser needs a bytes copy anyway
+MMAP_MIN_SIZE = 16 * 1024
+
+# Parsed files keyed by path, as ((st_mtime_ns, st_size), object)
+_cache = {}
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _read_json(path, decode=None):
+    key = _stat_key(path)
+    hit = _cache.get(path)
+    if hit and hit[0] == key:
+        return hit[1]
+    with open(path, "rb") as f:
+        if orjson is not None and key[1] >= MMAP_MIN_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    obj = loads(view)
+        else:
+            obj = loads(f.read())
+    if decode is not None:
+        obj = decode(obj)
+    _cache[path] = (key, obj)
+    return obj
+
+
+# Bytes last written per path, to skip saves that change nothing
+_last_written = {}
+
+
+def _atomic_write(path, data):
+    """Replace path with data so readers never see a partial file."""
+    tmp = f"{path}.tmp.{os.getpid()}"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
+
+
+def _write_json(path, obj, encode=None):
+    # Serialize first so the file gets a single write() call
+    data = dumps(encode(obj) if encode is not None else obj)
+    if _last_written.get(path) == data:
+        return
+    _atomic_write(path, data)
+    _last_written[path] = data
+    _cache[path] = (_stat_key(path), obj)
 
 
 def load_settings():
     """Load per-engine settings."""
     try:
-        with open(SETTINGS_FILE, "r") as f:
-            return json.load(f)
+        return _read_json(SETTINGS_FILE)
     except (FileNotFoundError, json.JSONDecodeError):
         return {}
 
@@ -25,15 +114,107 @@ def load_settings():
 def save_settings(settings):
     """Save per-engine settings."""
     _ensure_config_dir()
-    with open(SETTINGS_FILE, "w") as f:
-        json.dump(settings, f, indent=2)
+    _write_json(SETTINGS_FILE, settings)
+
+
+# Latest settings waiting for the debounce timer, and that timer's id
+_pending_settings = None
+_pending_timer = 0
+
+
+def schedule_save_settings(settings):
+    """Save per-engine settings shortly, coalescing rapid changes into one write."""
+    global _pending_settings, _pending_timer
+    _pending_settings = settings
+    if _pending_timer:
+        return
+    from gi.repository import GLib
+    _pending_timer = GLib.timeout_add(500, _do_flush)
+
+
+def _do_flush():
+    global _pending_timer
+    _pending_timer = 0
+    flush_settings()
+    return False
+
+
+def flush_settings():
+    """Write out settings queued by schedule_save_settings() now."""
+    global _pending_settings, _pending_timer
+    if _pending_timer:
+        from gi.repository import GLib
+        GLib.source_remove(_pending_timer)
+        _pending_timer = 0
+    if _pending_settings is not None:
+        settings, _pending_settings = _pending_settings, None
+        save_settings(settings)
+
+
+def _settings_key(settings):
+    canonical = json.dumps(settings, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(canonical).hexdigest()[:12]
+
+
+# Version of the packed favorites.json written by _pack_favorites(); the
+# plain list used when nothing is shared has no version
+FAVORITES_VERSION = 2
+
+
+def _pack_favorites(favorites):
+    """Store settings dicts used by several favorites once, in "_shared".
+
+    Favorites that share nothing are written as the plain list older
+    versions read, which is also smaller than the packed form then.
+    """
+    keys = [
+        _settings_key(fav["settings"])
+        if isinstance(fav.get("settings"), dict) else None
+        for fav in favorites
+    ]
+    counts = {}
+    for key in keys:
+        if key is not None:
+            counts[key] = counts.get(key, 0) + 1
+    if not any(n > 1 for n in counts.values()):
+        return favorites
+
+    shared = {}
+    packed = []
+    for fav, key in zip(favorites, keys):
+        if key is not None and counts[key] > 1:
+            shared.setdefault(key, fav["settings"])
+            fav = {k: v for k, v in fav.items() if k != "settings"}
+            fav["settings_ref"] = key
+        packed.append(fav)
+    return {"version": FAVORITES_VERSION, "_shared": shared, "favorites": packed}
+
+
+def _unpack_favorites(data):
+    """Inverse of _pack_favorites(); equal settings end up as one dict."""
+    if isinstance(data, dict):
+        shared = data.get("_shared", {})
+        favorites = []
+        for fav in data.get("favorites", []):
+            ref = fav.pop("settings_ref", None)
+            if ref in shared:
+                fav["settings"] = shared[ref]
+            favorites.append(fav)
+    else:
+        favorites = data
+    # Share equal settings in memory too, whichever form was read
+    interned = {}
+    for fav in favorites:
+        settings = fav.get("settings")
+        if isinstance(settings, dict):
+            fav["settings"] = interned.setdefault(_settings_key(settings), settings)
+    return favorites
 
 
 def load_favorites():
     """Load favorites list."""
     try:
-        with open(FAVORITES_FILE, "r") as f:
-            return json.load(f)
+        return _read_json(FAVORITES_FILE, _unpack_favorites)
     except (FileNotFoundError, json.JSONDecodeError):
         return []
 
@@ -41,5 +222,4 @@ def load_favorites():
 def save_favorites(favorites):
     """Save favorites list."""
     _ensure_config_dir()
-    with open(FAVORITES_FILE, "w") as f:
-        json.dump(favorites, f, indent=2)
+    _write_json(FAVORITES_FILE, favorites, _pack_favorites)
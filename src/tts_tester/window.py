@@ -0,0 +1,1353 @@
+"""Main window and application for TTS Tester."""
+
+import os
+import json
+import gettext
+import locale
+import time
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+# Prefer the ngl renderer, which scrolls text views much more smoothly than
+# the old gl renderer on some drivers. Must be set before GTK is loaded, and
+# a renderer chosen by the user still wins.
+os.environ.setdefault("GSK_RENDERER", "ngl")
+
+import gi
+gi.require_version('Gtk', '4.0')
+gi.require_version('Adw', '1')
+
+from gi.repository import Gtk, Adw, Gio, GLib
+
+from tts_tester import __version__
+from tts_tester.engines import (
+    detect_engines, engines_signature, ENGINE_CLASSES
+)
+from tts_tester.settings import (
+    load_settings, schedule_save_settings, flush_settings,
+    load_favorites, save_favorites, dumps,
+)
+
+# Set up gettext
+TEXTDOMAIN = 'tts-tester'
+_ = gettext.translation(
+    TEXTDOMAIN, '/usr/share/locale', fallback=True
+).gettext
+# GtkBuilder translates translatable="yes" strings through libintl
+try:
+    locale.bindtextdomain(TEXTDOMAIN, '/usr/share/locale')
+    locale.textdomain(TEXTDOMAIN)
+except AttributeError:
+    pass
+
+# Sample texts for different languages
+SAMPLE_TEXTS = {
+    "English": "The quick brown fox jumps over the lazy dog. "
+               "This is a sample text for testing text-to-speech engines.",
+    "Svenska": "Den snabba bruna räven hoppar över den lata hunden. "
+               "Detta är en exempeltext för att testa text-till-tal-motorer.",
+    "Deutsch": "Der schnelle braune Fuchs springt über den faulen Hund. "
+               "Dies ist ein Beispieltext zum Testen von Text-zu-Sprache-Engines.",
+    "Français": "Le rapide renard brun saute par-dessus le chien paresseux. "
+                "Ceci est un texte d'exemple pour tester les moteurs de synthèse vocale.",
+    "Español": "El rápido zorro marrón salta sobre el perro perezoso. "
+               "Este es un texto de ejemplo para probar motores de texto a voz.",
+}
+
+SSML_TEMPLATE = """<speak>
+  Hello, this is a <emphasis level="strong">test</emphasis> of SSML.
+  <break time="500ms"/>
+  <prosody rate="slow" pitch="low">This part is slower and lower.</prosody>
+  <break time="300ms"/>
+  <prosody rate="fast" pitch="high">And this part is faster and higher!</prosody>
+</speak>"""
+
+_SHORTCUTS_XML = """\
+<interface>
+  <object class="GtkShortcutsWindow" id="shortcuts">
+    <property name="modal">True</property>
+    <child>
+      <object class="GtkShortcutsSection">
+        <property name="section-name">shortcuts</property>
+        <child>
+          <object class="GtkShortcutsGroup">
+            <property name="title" translatable="yes">Playback</property>
+            <child>
+              <object class="GtkShortcutsShortcut">
+                <property name="title" translatable="yes">Play</property>
+                <property name="accelerator">&lt;Primary&gt;Return</property>
+              </object>
+            </child>
+          </object>
+        </child>
+        <child>
+          <object class="GtkShortcutsGroup">
+            <property name="title" translatable="yes">General</property>
+            <child>
+              <object class="GtkShortcutsShortcut">
+                <property name="title" translatable="yes">Export</property>
+                <property name="accelerator">&lt;Primary&gt;e</property>
+              </object>
+            </child>
+            <child>
+              <object class="GtkShortcutsShortcut">
+                <property name="title" translatable="yes">Refresh Engines</property>
+                <property name="accelerator">F5</property>
+              </object>
+            </child>
+            <child>
+              <object class="GtkShortcutsShortcut">
+                <property name="title" translatable="yes">Show Shortcuts</property>
+                <property name="accelerator">&lt;Primary&gt;question</property>
+              </object>
+            </child>
+            <child>
+              <object class="GtkShortcutsShortcut">
+                <property name="title" translatable="yes">Quit</property>
+                <property name="accelerator">&lt;Primary&gt;q</property>
+              </object>
+            </child>
+          </object>
+        </child>
+      </object>
+    </child>
+  </object>
+</interface>
+"""
+
+
+def _buffer_is_blank(buf):
+    """Return True if buf is empty or whitespace, without copying its text."""
+    if buf.get_char_count() == 0:
+        return True
+    it = buf.get_start_iter()
+    while not it.is_end():
+        if not it.get_char().isspace():
+            return False
+        it.forward_char()
+    return True
+
+
+# Last formatted second and its string, as [seconds, "HH:MM:SS"]
+_ts_cache = [0, ""]
+
+
+def _timestamp():
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache[0] = now
+        _ts_cache[1] = time.strftime("%H:%M:%S", time.localtime(now))
+    return _ts_cache[1]
+
+
+
+def _write_export(path, data_items):
+    """Write export (key, value) pairs to path as CSV or JSON."""
+    if path.endswith(".csv"):
+        import csv
+        # Nested values go into a single cell as compact JSON
+        rows = [("key", "value")]
+        rows += [
+            (k, json.dumps(v, separators=(",", ":"))
+             if isinstance(v, (dict, list)) else v)
+            for k, v in data_items
+        ]
+        with open(path, "w", newline="", buffering=1 << 16) as f:
+            csv.writer(f).writerows(rows)
+    else:
+        with open(path, "wb") as f:
+            f.write(dumps(dict(data_items)))
+
+
+def _wlc_settings_path():
+    import os
+    xdg = os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config"))
+    d = os.path.join(xdg, "tts-tester")
+    os.makedirs(d, exist_ok=True)
+    return os.path.join(d, "welcome.json")
+
+def _load_wlc_settings():
+    import os, json
+    p = _wlc_settings_path()
+    if os.path.exists(p):
+        with open(p) as f:
+            return json.load(f)
+    return {"welcome_shown": False}
+
+def _save_wlc_settings(s):
+    import json
+    with open(_wlc_settings_path(), "w") as f:
+        json.dump(s, f, indent=2)
+
+
+_VOICE_PANEL_XML = """\
+<interface>
+  <template class="TtsTesterVoiceSettingsPanel" parent="GtkBox">
+    <property name="orientation">vertical</property>
+    <property name="spacing">6</property>
+    <property name="margin-start">12</property>
+    <property name="margin-end">12</property>
+    <property name="margin-top">6</property>
+    <property name="margin-bottom">6</property>
+    <child>
+      <object class="GtkLabel" id="voice_label">
+        <property name="xalign">0</property>
+        <style>
+          <class name="heading"/>
+        </style>
+      </object>
+    </child>
+    <child>
+      <object class="GtkDropDown" id="voice_dropdown">
+        <property name="model">
+          <object class="GtkStringList"/>
+        </property>
+        <signal name="notify::selected" handler="_on_voice_changed"/>
+      </object>
+    </child>
+    <child>
+      <object class="GtkLabel" id="speed_label">
+        <property name="xalign">0</property>
+        <style>
+          <class name="heading"/>
+        </style>
+      </object>
+    </child>
+    <child>
+      <object class="GtkScale" id="speed_scale">
+        <property name="orientation">horizontal</property>
+        <property name="digits">1</property>
+        <property name="adjustment">
+          <object class="GtkAdjustment">
+            <property name="lower">0.25</property>
+            <property name="upper">4.0</property>
+            <property name="step-increment">0.25</property>
+            <property name="page-increment">2.5</property>
+            <property name="value">1.0</property>
+          </object>
+        </property>
+        <marks>
+          <mark value="1.0" position="bottom"/>
+        </marks>
+        <signal name="value-changed" handler="_on_setting_changed"/>
+      </object>
+    </child>
+    <child>
+      <object class="GtkLabel" id="pitch_label">
+        <property name="xalign">0</property>
+        <style>
+          <class name="heading"/>
+        </style>
+      </object>
+    </child>
+    <child>
+      <object class="GtkScale" id="pitch_scale">
+        <property name="orientation">horizontal</property>
+        <property name="digits">1</property>
+        <property name="adjustment">
+          <object class="GtkAdjustment">
+            <property name="lower">0.25</property>
+            <property name="upper">2.0</property>
+            <property name="step-increment">0.25</property>
+            <property name="page-increment">2.5</property>
+            <property name="value">1.0</property>
+          </object>
+        </property>
+        <marks>
+          <mark value="1.0" position="bottom"/>
+        </marks>
+        <signal name="value-changed" handler="_on_setting_changed"/>
+      </object>
+    </child>
+    <child>
+      <object class="GtkLabel" id="volume_label">
+        <property name="xalign">0</property>
+        <style>
+          <class name="heading"/>
+        </style>
+      </object>
+    </child>
+    <child>
+      <object class="GtkScale" id="volume_scale">
+        <property name="orientation">horizontal</property>
+        <property name="digits">1</property>
+        <property name="adjustment">
+          <object class="GtkAdjustment">
+            <property name="lower">0.0</property>
+            <property name="upper">2.0</property>
+            <property name="step-increment">0.1</property>
+            <property name="page-increment">1</property>
+            <property name="value">1.0</property>
+          </object>
+        </property>
+        <marks>
+          <mark value="1.0" position="bottom"/>
+        </marks>
+        <signal name="value-changed" handler="_on_setting_changed"/>
+      </object>
+    </child>
+  </template>
+</interface>
+"""
+
+
+@Gtk.Template(string=_VOICE_PANEL_XML)
+class VoiceSettingsPanel(Gtk.Box):
+    """Panel with voice/speed/pitch/volume controls for one engine."""
+
+    __gtype_name__ = "TtsTesterVoiceSettingsPanel"
+
+    voice_label = Gtk.Template.Child()
+    speed_label = Gtk.Template.Child()
+    pitch_label = Gtk.Template.Child()
+    volume_label = Gtk.Template.Child()
+    voice_dropdown = Gtk.Template.Child()
+    speed_scale = Gtk.Template.Child()
+    pitch_scale = Gtk.Template.Child()
+    volume_scale = Gtk.Template.Child()
+
+    _on_change = None
+
+    def __init__(self, on_change=None):
+        super().__init__()
+        # Labels are set here so the Python string extractor sees them
+        self.voice_label.set_label(_("Voice"))
+        self.speed_label.set_label(_("Speed"))
+        self.pitch_label.set_label(_("Pitch"))
+        self.volume_label.set_label(_("Volume"))
+        self._on_change = on_change
+        self._voice_ids = []
+
+    def populate_voices(self, voices):
+        """Set voice list. voices is list of (id, display_name)."""
+        self._voice_ids = [v[0] for v in voices]
+        names = [v[1] for v in voices]
+        self.voice_dropdown.set_model(Gtk.StringList.new(names if names else [_("(none)")]))
+        if not voices:
+            self._voice_ids = [""]
+
+    def get_selected_voice(self):
+        idx = self.voice_dropdown.get_selected()
+        if 0 <= idx < len(self._voice_ids):
+            return self._voice_ids[idx]
+        return None
+
+    def set_selected_voice(self, voice_id):
+        if voice_id in self._voice_ids:
+            self.voice_dropdown.set_selected(self._voice_ids.index(voice_id))
+
+    def get_settings(self):
+        return {
+            "voice": self.get_selected_voice(),
+            "speed": self.speed_scale.get_value(),
+            "pitch": self.pitch_scale.get_value(),
+            "volume": self.volume_scale.get_value(),
+        }
+
+    def apply_settings(self, settings):
+        # Report the whole update once rather than once per control
+        on_change, self._on_change = self._on_change, None
+        try:
+            if "speed" in settings:
+                self.speed_scale.set_value(settings["speed"])
+            if "pitch" in settings:
+                self.pitch_scale.set_value(settings["pitch"])
+            if "volume" in settings:
+                self.volume_scale.set_value(settings["volume"])
+            if "voice" in settings and settings["voice"]:
+                self.set_selected_voice(settings["voice"])
+        finally:
+            self._on_change = on_change
+        if on_change:
+            on_change()
+
+    @Gtk.Template.Callback()
+    def _on_voice_changed(self, dropdown, pspec):
+        if self._on_change:
+            self._on_change()
+
+    @Gtk.Template.Callback()
+    def _on_setting_changed(self, scale):
+        if self._on_change:
+            self._on_change()
+
+
+class MainWindow(Adw.ApplicationWindow):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.set_default_size(1000, 700)
+        self.set_title(_("TTS Tester"))
+
+        self._engines = {}
+        self._ab_engines = {}  # "A"/"B" -> engine instance for that side
+        self._current_engine = None
+        self._current_engine_name = None
+        self._playback_process = None
+        self._ab_mode = False
+        self._ssml_mode = False
+        self._available_engine_classes = []
+        self._engine_list = []
+        self._engine_ids = ()
+        self._engine_names = ()
+        self._engine_sig = None
+        self._all_settings = load_settings()
+        self._favorites = load_favorites()
+        # Older files may repeat a name; the first favorite with it wins,
+        # as it did when the menu was searched in order
+        self._favorites_by_name = {}
+        for fav in self._favorites:
+            self._favorites_by_name.setdefault(fav.get("name", ""), fav)
+        self._ab_ratings = {}  # track A/B ratings
+        self._text_update_source_id = 0
+        self._export_dialog = None
+        # Exports are encoded and written off the main thread
+        self._export_pool = ThreadPoolExecutor(max_workers=1)
+        # Synthesis jobs run one at a time on a single worker thread
+        self._job_q = queue.Queue(maxsize=4)
+        threading.Thread(target=self._worker_loop, daemon=True).start()
+
+        # Build UI
+        self._build_ui()
+        self._engine_dropdown.set_model(
+            Gtk.StringList.new([_("Detecting engines…")])
+        )
+        self._update_status(_("Detecting engines…"))
+        # Probing engines can be slow; let the window paint first
+        threading.Thread(target=self._bg_detect, daemon=True).start()
+        self.connect("close-request", self._on_close_request)
+
+    def _build_ui(self):
+        # Main layout
+        self._main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        self.set_content(self._main_box)
+
+        # Header bar
+        header = Adw.HeaderBar()
+        header.set_title_widget(Gtk.Label(label=_("TTS Tester")))
+
+        # Engine selector
+        self._engine_dropdown = Gtk.DropDown()
+        self._engine_dropdown.connect("notify::selected", self._on_engine_changed)
+        header.pack_start(self._engine_dropdown)
+
+        # Play button
+        play_btn = Gtk.Button(icon_name="media-playback-start-symbolic")
+        play_btn.set_tooltip_text(_("Play (Ctrl+Enter)"))
+        play_btn.connect("clicked", self._on_play)
+        play_btn.add_css_class("suggested-action")
+        header.pack_start(play_btn)
+
+        # Stop button
+        stop_btn = Gtk.Button(icon_name="media-playback-stop-symbolic")
+        stop_btn.set_tooltip_text(_("Stop"))
+        stop_btn.connect("clicked", self._on_stop)
+        header.pack_start(stop_btn)
+
+        # A/B toggle
+        self._ab_toggle = Gtk.ToggleButton(label=_("A/B"))
+        self._ab_toggle.set_tooltip_text(_("A/B Comparison Mode"))
+        self._ab_toggle.connect("toggled", self._on_ab_toggled)
+        header.pack_start(self._ab_toggle)
+
+        # SSML toggle
+        self._ssml_toggle = Gtk.ToggleButton(label=_("SSML"))
+        self._ssml_toggle.set_tooltip_text(_("SSML Editing Mode"))
+        self._ssml_toggle.connect("toggled", self._on_ssml_toggled)
+        header.pack_start(self._ssml_toggle)
+
+        # Save audio button
+        save_btn = Gtk.Button(icon_name="document-save-symbolic")
+        save_btn.set_tooltip_text(_("Save Audio"))
+        save_btn.connect("clicked", self._on_save_audio)
+        header.pack_end(save_btn)
+
+        # Favorites dropdown
+        self._favorites_button = Gtk.MenuButton(icon_name="starred-symbolic")
+        self._favorites_button.set_tooltip_text(_("Favorites"))
+        self._build_favorites_menu()
+        header.pack_end(self._favorites_button)
+
+        # Menu button
+        menu_btn = Gtk.MenuButton(icon_name="open-menu-symbolic")
+        menu_model = Gio.Menu()
+        menu_model.append(_("Load Text from File…"), "win.load-text")
+        menu_model.append(_("Save Favorite…"), "win.save-favorite")
+
+        sample_section = Gio.Menu()
+        for lang in SAMPLE_TEXTS:
+            item = Gio.MenuItem.new(_("Sample: %s") % lang, None)
+            item.set_action_and_target_value(
+                "win.sample", GLib.Variant.new_string(lang)
+            )
+            sample_section.append_item(item)
+        menu_model.append_section(_("Sample Texts"), sample_section)
+
+        menu_model.append(_("Export…"), "app.export")
+        menu_model.append(_("Keyboard Shortcuts"), "app.shortcuts")
+        menu_model.append(_("About TTS Tester"), "app.about")
+        menu_btn.set_menu_model(menu_model)
+        header.pack_end(menu_btn)
+
+        self._main_box.append(header)
+
+        # Content area — stack for normal vs A/B mode
+        self._view_stack = Gtk.Stack()
+        self._view_stack.set_transition_type(Gtk.StackTransitionType.CROSSFADE)
+        self._main_box.append(self._view_stack)
+
+        # Normal view
+        self._normal_view = self._build_normal_view()
+        self._view_stack.add_named(self._normal_view, "normal")
+
+        # A/B view
+        self._ab_view = self._build_ab_view()
+        self._view_stack.add_named(self._ab_view, "ab")
+
+        self._view_stack.set_visible_child_name("normal")
+
+        # Busy spinner
+        self._progress = Gtk.Spinner()
+        self._progress.set_visible(False)
+        self._main_box.append(self._progress)
+
+        # Status bar
+        self._status_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+        self._status_box.set_margin_start(12)
+        self._status_box.set_margin_end(12)
+        self._status_box.set_margin_top(4)
+        self._status_box.set_margin_bottom(4)
+
+        self._status_label = Gtk.Label(label=_("Ready"), xalign=0)
+        self._status_label.add_css_class("dim-label")
+        self._status_label.set_hexpand(True)
+        self._status_box.append(self._status_label)
+
+        self._char_count_label = Gtk.Label(label="", xalign=1)
+        self._char_count_label.add_css_class("dim-label")
+        self._status_box.append(self._char_count_label)
+
+        self._engine_info_label = Gtk.Label(label="", xalign=1)
+        self._engine_info_label.add_css_class("dim-label")
+        self._status_box.append(self._engine_info_label)
+
+        self._main_box.append(self._status_box)
+
+        # Window actions
+        self._setup_window_actions()
+
+    def _build_normal_view(self):
+        """Build the normal (non-A/B) view."""
+        paned = Gtk.Paned(orientation=Gtk.Orientation.HORIZONTAL)
+        paned.set_vexpand(True)
+        paned.set_shrink_start_child(False)
+        paned.set_shrink_end_child(False)
+
+        # Left: text editor
+        text_frame = Gtk.Frame()
+        text_frame.set_margin_start(6)
+        text_frame.set_margin_top(6)
+        text_frame.set_margin_bottom(6)
+
+        scroll = Gtk.ScrolledWindow()
+        scroll.set_vexpand(True)
+        scroll.set_hexpand(True)
+        scroll.set_min_content_width(400)
+
+        self._text_view = Gtk.TextView()
+        self._text_view.set_wrap_mode(Gtk.WrapMode.WORD_CHAR)
+        self._text_view.set_left_margin(12)
+        self._text_view.set_right_margin(12)
+        self._text_view.set_top_margin(12)
+        self._text_view.set_bottom_margin(12)
+        self._text_view.get_buffer().connect("changed", self._on_text_changed)
+
+        scroll.set_child(self._text_view)
+        text_frame.set_child(scroll)
+        paned.set_start_child(text_frame)
+
+        # Right: voice settings
+        settings_scroll = Gtk.ScrolledWindow()
+        settings_scroll.set_min_content_width(250)
+        settings_scroll.set_margin_end(6)
+        settings_scroll.set_margin_top(6)
+        settings_scroll.set_margin_bottom(6)
+
+        self._voice_panel = VoiceSettingsPanel(on_change=self._on_voice_settings_changed)
+        settings_scroll.set_child(self._voice_panel)
+        paned.set_end_child(settings_scroll)
+
+        paned.set_position(600)
+        return paned
+
+    def _build_ab_view(self):
+        """Build the A/B comparison view."""
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        box.set_vexpand(True)
+
+        # Shared text editor
+        text_frame = Gtk.Frame()
+        text_frame.set_margin_start(6)
+        text_frame.set_margin_end(6)
+        text_frame.set_margin_top(6)
+
+        scroll = Gtk.ScrolledWindow()
+        scroll.set_vexpand(True)
+        scroll.set_min_content_height(150)
+
+        self._ab_text_view = Gtk.TextView()
+        self._ab_text_view.set_wrap_mode(Gtk.WrapMode.WORD_CHAR)
+        self._ab_text_view.set_left_margin(12)
+        self._ab_text_view.set_right_margin(12)
+        self._ab_text_view.set_top_margin(12)
+        self._ab_text_view.set_bottom_margin(12)
+
+        scroll.set_child(self._ab_text_view)
+        text_frame.set_child(scroll)
+        box.append(text_frame)
+
+        # Split pane: Engine A | Engine B
+        paned = Gtk.Paned(orientation=Gtk.Orientation.HORIZONTAL)
+        paned.set_vexpand(True)
+        paned.set_shrink_start_child(False)
+        paned.set_shrink_end_child(False)
+
+        # Engine A
+        a_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        a_label = Gtk.Label(label=_("Engine A"))
+        a_label.add_css_class("title-3")
+        a_box.append(a_label)
+
+        self._ab_engine_a = Gtk.DropDown()
+        a_box.append(self._ab_engine_a)
+
+        self._ab_panel_a = VoiceSettingsPanel()
+        a_box.append(self._ab_panel_a)
+
+        a_buttons = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        a_buttons.set_halign(Gtk.Align.CENTER)
+        play_a = Gtk.Button(label=_("Play A"))
+        play_a.add_css_class("suggested-action")
+        play_a.connect("clicked", self._on_play_a)
+        a_buttons.append(play_a)
+
+        self._ab_rate_a_up = Gtk.Button(icon_name="thumb-up-symbolic")
+        self._ab_rate_a_up.set_tooltip_text(_("Thumbs Up"))
+        self._ab_rate_a_up.connect("clicked", lambda b: self._rate_ab("A", "up"))
+        a_buttons.append(self._ab_rate_a_up)
+
+        self._ab_rate_a_down = Gtk.Button(icon_name="thumb-down-symbolic")
+        self._ab_rate_a_down.set_tooltip_text(_("Thumbs Down"))
+        self._ab_rate_a_down.connect("clicked", lambda b: self._rate_ab("A", "down"))
+        a_buttons.append(self._ab_rate_a_down)
+
+        a_box.append(a_buttons)
+        paned.set_start_child(a_box)
+
+        # Engine B
+        b_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        b_label = Gtk.Label(label=_("Engine B"))
+        b_label.add_css_class("title-3")
+        b_box.append(b_label)
+
+        self._ab_engine_b = Gtk.DropDown()
+        b_box.append(self._ab_engine_b)
+
+        self._ab_panel_b = VoiceSettingsPanel()
+        b_box.append(self._ab_panel_b)
+
+        b_buttons = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        b_buttons.set_halign(Gtk.Align.CENTER)
+        play_b = Gtk.Button(label=_("Play B"))
+        play_b.add_css_class("suggested-action")
+        play_b.connect("clicked", self._on_play_b)
+        b_buttons.append(play_b)
+
+        self._ab_rate_b_up = Gtk.Button(icon_name="thumb-up-symbolic")
+        self._ab_rate_b_up.set_tooltip_text(_("Thumbs Up"))
+        self._ab_rate_b_up.connect("clicked", lambda b: self._rate_ab("B", "up"))
+        b_buttons.append(self._ab_rate_b_up)
+
+        self._ab_rate_b_down = Gtk.Button(icon_name="thumb-down-symbolic")
+        self._ab_rate_b_down.set_tooltip_text(_("Thumbs Down"))
+        self._ab_rate_b_down.connect("clicked", lambda b: self._rate_ab("B", "down"))
+        b_buttons.append(self._ab_rate_b_down)
+
+        b_box.append(b_buttons)
+        paned.set_end_child(b_box)
+
+        box.append(paned)
+
+        # Play Both button
+        both_btn = Gtk.Button(label=_("Play Both"))
+        both_btn.set_halign(Gtk.Align.CENTER)
+        both_btn.set_margin_bottom(6)
+        both_btn.add_css_class("suggested-action")
+        both_btn.connect("clicked", self._on_play_both)
+        box.append(both_btn)
+
+        return box
+
+    def _setup_window_actions(self):
+        """Create window-level actions."""
+        load_action = Gio.SimpleAction.new("load-text", None)
+        load_action.connect("activate", self._on_load_text)
+        self.add_action(load_action)
+
+        save_fav_action = Gio.SimpleAction.new("save-favorite", None)
+        save_fav_action.connect("activate", self._on_save_favorite)
+        self.add_action(save_fav_action)
+
+        # Favorites menu action, the target is the favorite's name
+        load_fav_action = Gio.SimpleAction.new(
+            "load-favorite", GLib.VariantType.new("s")
+        )
+        load_fav_action.connect("activate", self._on_load_favorite)
+        self.add_action(load_fav_action)
+
+        # Sample text action, the target is the SAMPLE_TEXTS key
+        sample_action = Gio.SimpleAction.new("sample", GLib.VariantType.new("s"))
+        sample_action.connect("activate", self._on_sample)
+        self.add_action(sample_action)
+
+    def _on_sample(self, action, param):
+        lang = param.get_string()
+        if lang not in SAMPLE_TEXTS:
+            return
+        buf = self._get_active_text_buffer()
+        buf.set_text(SAMPLE_TEXTS[lang])
+        self._update_status(_("Loaded sample text: %s") % lang)
+
+    def _get_active_text_buffer(self):
+        if self._ab_mode:
+            return self._ab_text_view.get_buffer()
+        return self._text_view.get_buffer()
+
+    def _get_text(self):
+        buf = self._get_active_text_buffer()
+        return buf.get_text(buf.get_start_iter(), buf.get_end_iter(), True)
+
+    # --- Engine management ---
+
+    def _bg_detect(self):
+        sig = engines_signature()
+        GLib.idle_add(self._apply_detected, detect_engines(), sig)
+
+    def _apply_detected(self, engine_classes, sig):
+        self._available_engine_classes = engine_classes
+        self._engine_sig = sig
+        self._populate_engines()
+        self._update_status(_("Ready"))
+        return False
+
+    def _populate_engines(self):
+        if self._available_engine_classes:
+            self._engine_list = list(self._available_engine_classes)
+            names = [cls.display_name for cls in self._engine_list]
+        else:
+            # Show all engines even if unavailable, for UI completeness
+            self._engine_list = list(ENGINE_CLASSES)
+            names = [cls.display_name + _(" (not found)")
+                     for cls in self._engine_list]
+        # Looked up by dropdown position in the selection handlers
+        self._engine_ids = tuple(cls.name for cls in self._engine_list)
+        self._engine_names = tuple(cls.display_name for cls in self._engine_list)
+
+        # The three dropdowns list the same engines, so share one model
+        model = Gtk.StringList.new(names)
+        self._engine_dropdown.set_model(model)
+        self._ab_engine_a.set_model(model)
+        self._ab_engine_b.set_model(model)
+
+        if self._engine_list:
+            self._engine_dropdown.set_selected(0)
+            self._switch_engine(0)
+
+    def _switch_engine(self, idx):
+        if idx < 0 or idx >= len(self._engine_list):
+            return
+        engine_name = self._engine_ids[idx]
+
+        if engine_name not in self._engines:
+            self._engines[engine_name] = self._engine_list[idx]()
+
+        self._current_engine = self._engines[engine_name]
+        self._current_engine_name = engine_name
+
+        # Load voices
+        voices = self._current_engine.get_voices()
+        self._voice_panel.populate_voices(voices)
+
+        # Restore saved settings
+        if engine_name in self._all_settings:
+            self._voice_panel.apply_settings(self._all_settings[engine_name])
+            self._current_engine.apply_settings(self._all_settings[engine_name])
+
+        display_name = self._engine_names[idx]
+        self._engine_info_label.set_text(display_name)
+        self._update_status(_("Engine: %s") % display_name)
+
+    def _get_ab_engine(self, which):
+        """Get or create engine for A/B panel."""
+        dropdown = self._ab_engine_a if which == "A" else self._ab_engine_b
+        panel = self._ab_panel_a if which == "A" else self._ab_panel_b
+        idx = dropdown.get_selected()
+        if idx < 0 or idx >= len(self._engine_list):
+            return None
+        cls = self._engine_list[idx]
+        engine = self._ab_engines.get(which)
+        if type(engine) is not cls:
+            engine = self._ab_engines[which] = cls()
+        settings = panel.get_settings()
+        engine.apply_settings(settings)
+        return engine
+
+    def _get_cached_voices(self, cls):
+        """Return the voices of an engine class without a new instance."""
+        if cls.name not in self._engines:
+            self._engines[cls.name] = cls()
+        return self._engines[cls.name].get_voices()
+
+    # --- Callbacks ---
+
+    def _on_engine_changed(self, dropdown, pspec):
+        self._switch_engine(dropdown.get_selected())
+
+    def _on_text_changed(self, buf):
+        # Recount once typing pauses instead of scanning the buffer per key
+        if self._text_update_source_id:
+            GLib.source_remove(self._text_update_source_id)
+        self._text_update_source_id = GLib.timeout_add(
+            150, self._recompute_counts, buf
+        )
+
+    def _recompute_counts(self, buf):
+        self._text_update_source_id = 0
+        chars = buf.get_char_count()
+        words = 0
+        if chars:
+            text = buf.get_text(buf.get_start_iter(), buf.get_end_iter(), True)
+            words = len(text.split())
+        self._char_count_label.set_text(
+            _("%(chars)d characters, %(words)d words") % {"chars": chars, "words": words}
+        )
+        return False
+
+    def _on_voice_settings_changed(self):
+        if self._current_engine and self._current_engine_name:
+            settings = self._voice_panel.get_settings()
+            self._current_engine.apply_settings(settings)
+            if self._all_settings.get(self._current_engine_name) == settings:
+                return
+            self._all_settings[self._current_engine_name] = settings
+            schedule_save_settings(self._all_settings)
+
+    def _on_close_request(self, window):
+        flush_settings()
+        return False
+
+    def _on_play(self, *args):
+        text = self._get_text().strip()
+        if not text:
+            self._update_status(_("No text to speak"))
+            return
+        if not self._current_engine:
+            self._update_status(_("No engine selected"))
+            return
+
+        def do_speak():
+            try:
+                self._current_engine.speak(text, ssml=self._ssml_mode)
+                GLib.idle_add(self._on_playback_done)
+            except Exception as e:
+                GLib.idle_add(self._on_playback_done, _("Error: %s") % str(e))
+
+        if not self._submit_job(do_speak):
+            return
+        self._update_status(_("Speaking…"))
+        self._progress.set_visible(True)
+        self._progress.start()
+
+    def _on_playback_done(self, msg=None):
+        self._progress.stop()
+        self._progress.set_visible(False)
+        self._update_status(msg or _("Playback finished"))
+
+    def _submit_job(self, job):
+        """Queue job for the worker thread. Returns False if the queue is full."""
+        try:
+            self._job_q.put_nowait(job)
+        except queue.Full:
+            self._update_status(_("Busy, please wait"))
+            return False
+        return True
+
+    def _worker_loop(self):
+        while True:
+            job = self._job_q.get()
+            job()
+
+    def _on_stop(self, *args):
+        # Drop queued jobs so playback doesn't resume after stopping
+        while True:
+            try:
+                self._job_q.get_nowait()
+            except queue.Empty:
+                break
+        if self._current_engine:
+            self._current_engine.stop()
+        # An A/B job may be the one holding the worker
+        for engine in self._ab_engines.values():
+            engine.stop()
+        self._progress.stop()
+        self._progress.set_visible(False)
+        self._update_status(_("Stopped"))
+
+    def _on_ab_toggled(self, btn):
+        self._ab_mode = btn.get_active()
+        if self._ab_mode:
+            # Sync text
+            text = self._get_text()
+            self._ab_text_view.get_buffer().set_text(text)
+            self._view_stack.set_visible_child_name("ab")
+            # Populate A/B engine voice lists
+            for dropdown, panel in [
+                (self._ab_engine_a, self._ab_panel_a),
+                (self._ab_engine_b, self._ab_panel_b),
+            ]:
+                idx = dropdown.get_selected()
+                if 0 <= idx < len(self._engine_list):
+                    cls = self._engine_list[idx]
+                    panel.populate_voices(self._get_cached_voices(cls))
+            self._update_status(_("A/B Comparison mode"))
+        else:
+            self._view_stack.set_visible_child_name("normal")
+            self._update_status(_("Normal mode"))
+
+    def _on_ssml_toggled(self, btn):
+        self._ssml_mode = btn.get_active()
+        if self._ssml_mode:
+            buf = self._get_active_text_buffer()
+            if _buffer_is_blank(buf):
+                buf.set_text(SSML_TEMPLATE)
+            self._update_status(_("SSML mode enabled"))
+        else:
+            self._update_status(_("Plain text mode"))
+
+    def _on_play_a(self, btn):
+        self._play_ab("A")
+
+    def _on_play_b(self, btn):
+        self._play_ab("B")
+
+    def _on_play_both(self, btn):
+        text_str = self._get_ab_text()
+        self._play_ab("A", text_str)
+        # Slight delay then play B (sequential for simplicity)
+        GLib.timeout_add(100, lambda: self._play_ab("B", text_str) or False)
+
+    def _get_ab_text(self):
+        buf = self._ab_text_view.get_buffer()
+        return buf.get_text(buf.get_start_iter(), buf.get_end_iter(), True).strip()
+
+    def _play_ab(self, which, text_str=None):
+        if text_str is None:
+            text_str = self._get_ab_text()
+        if not text_str:
+            self._update_status(_("No text to speak"))
+            return
+
+        engine = self._get_ab_engine(which)
+        if not engine:
+            self._update_status(_("No engine for %s") % which)
+            return
+
+        def do_speak():
+            try:
+                engine.speak(text_str, ssml=self._ssml_mode)
+                GLib.idle_add(
+                    self._update_status,
+                    _("Finished %s") % which
+                )
+            except Exception as e:
+                GLib.idle_add(
+                    self._update_status,
+                    _("Error (%(engine)s): %(error)s") % {"engine": which, "error": str(e)}
+                )
+
+        if self._submit_job(do_speak):
+            self._update_status(_("Playing %s…") % which)
+
+    def _rate_ab(self, which, rating):
+        self._ab_ratings[which] = rating
+        self._update_status(
+            _("Rated %(engine)s: %(rating)s") % {"engine": which, "rating": "👍" if rating == "up" else "👎"}
+        )
+
+    def _on_save_audio(self, btn):
+        text = self._get_text().strip()
+        if not text:
+            self._update_status(_("No text to save"))
+            return
+        if not self._current_engine:
+            self._update_status(_("No engine selected"))
+            return
+
+        dialog = Gtk.FileDialog()
+        dialog.set_title(_("Save Audio"))
+        dialog.set_initial_name("output.wav")
+
+        filter_wav = Gtk.FileFilter()
+        filter_wav.set_name(_("WAV files"))
+        filter_wav.add_pattern("*.wav")
+        filters = Gio.ListStore.new(Gtk.FileFilter)
+        filters.append(filter_wav)
+        dialog.set_filters(filters)
+
+        dialog.save(self, None, self._on_save_audio_response, text)
+
+    def _on_save_audio_response(self, dialog, result, text):
+        try:
+            gfile = dialog.save_finish(result)
+            path = gfile.get_path()
+
+            def do_save():
+                try:
+                    self._current_engine.speak(
+                        text, output_file=path, ssml=self._ssml_mode
+                    )
+                    GLib.idle_add(
+                        self._update_status,
+                        _("Audio saved to %s") % os.path.basename(path)
+                    )
+                except Exception as e:
+                    GLib.idle_add(
+                        self._update_status,
+                        _("Save error: %s") % str(e)
+                    )
+
+            if self._submit_job(do_save):
+                self._update_status(_("Saving audio…"))
+        except GLib.Error:
+            pass  # User cancelled
+
+    def _on_load_text(self, action, param):
+        dialog = Gtk.FileDialog()
+        dialog.set_title(_("Load Text File"))
+
+        filter_text = Gtk.FileFilter()
+        filter_text.set_name(_("Text files"))
+        filter_text.add_mime_type("text/plain")
+        filters = Gio.ListStore.new(Gtk.FileFilter)
+        filters.append(filter_text)
+        dialog.set_filters(filters)
+
+        dialog.open(self, None, self._on_load_text_response)
+
+    def _on_load_text_response(self, dialog, result):
+        try:
+            gfile = dialog.open_finish(result)
+            path = gfile.get_path()
+            with open(path, "r") as f:
+                text = f.read()
+            buf = self._get_active_text_buffer()
+            buf.set_text(text)
+            self._update_status(_("Loaded: %s") % os.path.basename(path))
+        except (GLib.Error, OSError):
+            pass
+
+    def _on_save_favorite(self, action, param):
+        dialog = Adw.AlertDialog()
+        dialog.set_heading(_("Save Favorite"))
+        dialog.set_body(_("Enter a name for this preset:"))
+        dialog.add_response("cancel", _("Cancel"))
+        dialog.add_response("save", _("Save"))
+        dialog.set_response_appearance("save", Adw.ResponseAppearance.SUGGESTED)
+
+        entry = Gtk.Entry()
+        entry.set_placeholder_text(_("Preset name"))
+        dialog.set_extra_child(entry)
+
+        dialog.choose(self, None, self._on_save_favorite_response, entry)
+
+    def _on_save_favorite_response(self, dialog, result, entry):
+        try:
+            response = dialog.choose_finish(result)
+        except GLib.Error:
+            return
+        if response != "save":
+            return
+
+        name = entry.get_text().strip()
+        if not name:
+            return
+
+        fav = {
+            "name": name,
+            "engine": self._current_engine_name,
+            "settings": self._voice_panel.get_settings(),
+        }
+
+        # Favorites are looked up by name, so saving under an existing
+        # name replaces that favorite
+        old = self._favorites_by_name.get(name)
+        self._favorites_by_name[name] = fav
+        if old is not None:
+            self._favorites[self._favorites.index(old)] = fav
+            save_favorites(self._favorites)
+        else:
+            self._favorites.append(fav)
+            save_favorites(self._favorites)
+            self._append_favorite_to_menu(len(self._favorites) - 1, fav)
+        self._update_status(_("Saved favorite: %s") % name)
+
+    def _build_favorites_menu(self):
+        self._favorites_menu = Gio.Menu()
+        noop = Gio.SimpleAction.new("noop", None)
+        noop.set_enabled(False)
+        self.add_action(noop)
+        if self._favorites:
+            for i, fav in enumerate(self._favorites):
+                # Later duplicates would only load the first one again
+                if self._favorites_by_name.get(fav.get("name", "")) is fav:
+                    self._append_favorite_to_menu(i, fav)
+        else:
+            self._favorites_menu.append(_("No favorites yet"), "win.noop")
+
+        self._favorites_button.set_menu_model(self._favorites_menu)
+
+    def _append_favorite_to_menu(self, idx, fav):
+        if idx == 0:
+            # Drop the "No favorites yet" placeholder
+            self._favorites_menu.remove_all()
+        item = Gio.MenuItem.new(fav.get("name", _("Unnamed")), None)
+        item.set_action_and_target_value(
+            "win.load-favorite", GLib.Variant.new_string(fav.get("name", ""))
+        )
+        self._favorites_menu.append_item(item)
+
+    def _on_load_favorite(self, action, param):
+        fav = self._favorites_by_name.get(param.get_string())
+        if fav is None:
+            return
+        # Switch engine
+        engine_name = fav.get("engine")
+        if engine_name in self._engine_ids:
+            self._engine_dropdown.set_selected(
+                self._engine_ids.index(engine_name)
+            )
+        # Apply settings; the panel passes them on to the engine
+        if "settings" in fav:
+            self._voice_panel.apply_settings(fav["settings"])
+        self._update_status(_("Loaded favorite: %s") % fav.get("name", ""))
+
+    def _update_status(self, msg):
+        self._status_label.set_text(f"[{_timestamp()}] {msg}")
+        return False
+
+    # --- Public for app-level actions ---
+
+    def show_about(self, action, param):
+        about = Adw.AboutDialog()
+        about.set_application_name(_("TTS Tester"))
+        about.set_application_icon("se.danielnylander.tts-tester")
+        about.set_developer_name("Daniel Nylander")
+        about.set_developers(["Daniel Nylander <daniel@danielnylander.se>"])
+        about.set_version(__version__)
+        about.set_website("https://github.com/yeager/tts-tester")
+        about.set_issue_url("https://github.com/yeager/tts-tester/issues")
+        about.set_copyright("© 2026 Daniel Nylander")
+        about.set_license_type(Gtk.License.GPL_3_0)
+        about.set_translator_credits(_("Translate this app: https://www.transifex.com/danielnylander/tts-tester/"))
+        about.present(self)
+
+    def show_shortcuts(self, action, param):
+        shortcuts = self.get_application().get_shortcuts_window()
+        shortcuts.set_transient_for(self)
+        shortcuts.present()
+        self._wlc_settings = _load_wlc_settings()
+        if not self._wlc_settings.get("welcome_shown"):
+            self._show_welcome(self)
+
+    def _show_welcome(self, win):
+        dialog = Adw.Dialog()
+        dialog.set_title(_("Welcome"))
+        dialog.set_content_width(420)
+        dialog.set_content_height(480)
+        page = Adw.StatusPage()
+        page.set_icon_name("audio-speakers-symbolic")
+        page.set_title(_("Welcome to TTS Tester"))
+        page.set_description(_(
+            "Test text-to-speech engines.\n\n✓ Compare TTS voices\n✓ Adjust speed and pitch\n✓ Multiple languages"
+        ))
+        btn = Gtk.Button(label=_("Get Started"))
+        btn.add_css_class("suggested-action")
+        btn.add_css_class("pill")
+        btn.set_halign(Gtk.Align.CENTER)
+        btn.set_margin_top(12)
+        btn.connect("clicked", self._on_welcome_close, dialog)
+        page.set_child(btn)
+        box = Adw.ToolbarView()
+        hb = Adw.HeaderBar()
+        hb.set_show_title(False)
+        box.add_top_bar(hb)
+        box.set_content(page)
+        dialog.set_child(box)
+        dialog.present(win)
+
+    def _on_welcome_close(self, btn, dialog):
+        self._wlc_settings["welcome_shown"] = True
+        _save_wlc_settings(self._wlc_settings)
+        dialog.close()
+
+
+    def do_export(self, action, param):
+        """Export settings/comparison data."""
+        # The dialog only describes the request, so it is built once and reused
+        if self._export_dialog is None:
+            dialog = Gtk.FileDialog()
+            dialog.set_title(_("Export Data"))
+            dialog.set_initial_name("tts-tester-export.json")
+
+            filter_json = Gtk.FileFilter()
+            filter_json.set_name(_("JSON files"))
+            filter_json.add_pattern("*.json")
+            filter_csv = Gtk.FileFilter()
+            filter_csv.set_name(_("CSV files"))
+            filter_csv.add_pattern("*.csv")
+            filters = Gio.ListStore.new(Gtk.FileFilter)
+            filters.append(filter_json)
+            filters.append(filter_csv)
+            dialog.set_filters(filters)
+            self._export_dialog = dialog
+
+        self._export_dialog.save(self, None, self._on_export_response)
+
+    def _on_export_response(self, dialog, result):
+        try:
+            gfile = dialog.save_finish(result)
+            path = gfile.get_path()
+        except GLib.Error:
+            return
+
+        data_items = (
+            ("version", __version__),
+            ("timestamp", time.strftime("%Y-%m-%d %H:%M:%S")),
+            ("engine", self._current_engine_name),
+            ("settings", self._voice_panel.get_settings() if self._current_engine else {}),
+            ("text", self._get_text()),
+            # The main thread only adds or replaces top-level entries in
+            # these, so shallow copies keep the writer thread race-free
+            ("ab_ratings", dict(self._ab_ratings)),
+            ("favorites", list(self._favorites)),
+        )
+
+        fut = self._export_pool.submit(_write_export, path, data_items)
+        fut.add_done_callback(
+            lambda f: GLib.idle_add(self._on_export_done, f, path)
+        )
+
+    def _on_export_done(self, fut, path):
+        e = fut.exception()
+        if e is not None:
+            self._update_status(_("Error: %s") % str(e))
+        else:
+            self._update_status(_("Exported to %s") % os.path.basename(path))
+        return False
+
+
+class Application(Adw.Application):
+    def __init__(self):
+        super().__init__(application_id="se.danielnylander.tts-tester")
+        self._shortcuts_window = None
+
+    def do_activate(self):
+        window = self.props.active_window
+        if not window:
+            window = MainWindow(application=self)
+        window.present()
+
+    def get_shortcuts_window(self):
+        """Return the shortcuts window, building it on first use."""
+        # Built once and re-presented on each request
+        if self._shortcuts_window is None:
+            builder = Gtk.Builder.new_from_string(_SHORTCUTS_XML, -1)
+            self._shortcuts_window = builder.get_object("shortcuts")
+            self._shortcuts_window.set_hide_on_close(True)
+        return self._shortcuts_window
+
+    def do_startup(self):
+        Adw.Application.do_startup(self)
+
+        # App actions
+        quit_action = Gio.SimpleAction.new("quit", None)
+        quit_action.connect("activate", self.quit_app)
+        self.add_action(quit_action)
+
+        about_action = Gio.SimpleAction.new("about", None)
+        about_action.connect("activate", self.show_about)
+        self.add_action(about_action)
+
+        shortcuts_action = Gio.SimpleAction.new("shortcuts", None)
+        shortcuts_action.connect("activate", self.show_shortcuts)
+        self.add_action(shortcuts_action)
+
+        refresh_action = Gio.SimpleAction.new("refresh", None)
+        refresh_action.connect("activate", self.refresh_data)
+        self.add_action(refresh_action)
+
+        export_action = Gio.SimpleAction.new("export", None)
+        export_action.connect("activate", self.do_export)
+        self.add_action(export_action)
+
+        play_action = Gio.SimpleAction.new("play", None)
+        play_action.connect("activate", self.play)
+        self.add_action(play_action)
+
+        # Keyboard shortcuts
+        self.set_accels_for_action("app.quit", ["<Primary>q"])
+        self.set_accels_for_action("app.shortcuts", ["<Primary>question"])
+        self.set_accels_for_action("app.refresh", ["F5"])
+        self.set_accels_for_action("app.export", ["<Primary>e"])
+        self.set_accels_for_action("app.play", ["<Primary>Return"])
+
+    def quit_app(self, action, param):
+        flush_settings()
+        self.quit()
+
+    def show_about(self, action, param):
+        window = self.props.active_window
+        if window:
+            window.show_about(action, param)
+
+    def show_shortcuts(self, action, param):
+        window = self.props.active_window
+        if window:
+            window.show_shortcuts(action, param)
+
+    def refresh_data(self, action, param):
+        window = self.props.active_window
+        if window:
+            for cls in ENGINE_CLASSES:
+                cls.invalidate_voices()
+            sig = engines_signature()
+            if sig == window._engine_sig:
+                # Same engines as before; only reload the current voice list
+                window._switch_engine(window._engine_dropdown.get_selected())
+                window._update_status(_("Engines unchanged"))
+                return
+            window._engine_sig = sig
+            window._available_engine_classes = detect_engines(refresh=True)
+            window._populate_engines()
+            window._update_status(_("Engines refreshed"))
+
+    def do_export(self, action, param):
+        window = self.props.active_window
+        if window:
+            window.do_export(action, param)
+
+    def play(self, action, param):
+        window = self.props.active_window
+        if window:
+            window._on_play()